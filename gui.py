@@ -1,8 +1,107 @@
+import json
+import math
+import os
 import threading
+import time
 import tkinter as tk
+import traceback
 from tkinter import filedialog, messagebox, ttk
 
-from project import download_file, download_youtube
+import yt_dlp
+
+from project import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_CONCURRENT_FRAGMENTS,
+    MAX_FILE_SIZE,
+    REQUEST_TIMEOUT,
+    SEGMENT_SIZE,
+    WRITE_BUFFER_SIZE,
+    _SESSION,
+    _download_segmented,
+    _filename_from_response,
+    _is_encoded,
+    _response_total_size,
+    download_file,
+    download_youtube,
+)
+
+INFO_CACHE_TTL = 5 * 60  # seconds an extracted YouTube info dict stays fresh
+PROGRESS_INTERVAL_MS = 100  # at most ten progress redraws per second
+YT_HOOK_INTERVAL = 0.05  # seconds between handled yt-dlp 'downloading' events
+PROGRESS_CHUNK_SIZE = 512 * 1024  # bytes between file-loop progress reports
+FORMAT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.dm_cache', 'formats.json')
+FORMAT_CACHE_TTL = 24 * 60 * 60  # seconds a cached format listing stays fresh
+YOUTUBE_OUTTMPL = '%(title)s.%(ext)s'  # used when no output file is given
+DEFAULT_QUALITIES = {
+    'best': 'best',
+    'worst': 'worst',
+    **{f'{h}p': f'best[height<={h}]' for h in (144, 240, 360, 480, 720, 1080)},
+}
+URL_DEBOUNCE_MS = 500  # wait for typing to settle before fetching qualities
+FORMAT_FIELDS = ('format_id', 'height', 'fps', 'ext', 'format_note')
+
+
+def _load_format_cache():
+    """Read the on-disk {url: [saved_at, formats]} cache, dropping stale entries."""
+    try:
+        with open(FORMAT_CACHE_PATH, encoding='utf-8') as f:
+            cache = json.load(f)
+        now = time.time()
+        return {url: entry for url, entry in cache.items() if now - entry[0] < FORMAT_CACHE_TTL}
+    except (OSError, ValueError, TypeError, AttributeError, IndexError):
+        # Unreadable or wrongly shaped cache; start empty
+        return {}
+
+
+def _save_format_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(FORMAT_CACHE_PATH), exist_ok=True)
+        tmp_path = FORMAT_CACHE_PATH + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, FORMAT_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _iter_available(resp, chunk_size):
+    """Yield body data as soon as it arrives, at most chunk_size bytes at a time.
+
+    Unlike iter_content, which blocks until a whole chunk is buffered, read1
+    returns after a single socket read, so pause/cancel are seen promptly.
+    """
+    read1 = getattr(resp.raw, 'read1', None)
+    if read1 is None:  # urllib3 < 2.3
+        yield from resp.iter_content(chunk_size=chunk_size)
+        return
+    resp.raw.decode_content = True
+    while True:
+        data = read1(chunk_size)
+        if not data:
+            return
+        yield data
+
+
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
+def _format_bytes(num):
+    # Every unit is 2**10 of the previous one, so log2 // 10 picks it directly
+    i = min(int(math.log2(max(num, 1)) // 10), len(BYTE_UNITS) - 1)
+    return f"{num / (1 << (10 * i)):.2f} {BYTE_UNITS[i]}"
+
+
+def _format_time(seconds):
+    if seconds is None or seconds == float('inf'):
+        return 'N/A'
+    seconds = int(seconds)
+    h, m, s = seconds // 3600, (seconds // 60) % 60, seconds % 60
+    if h:
+        return f"{h}h {m}m {s}s"
+    elif m:
+        return f"{m}m {s}s"
+    else:
+        return f"{s}s"
 
 
 class DownloaderGUI(tk.Tk):
@@ -23,19 +122,47 @@ class DownloaderGUI(tk.Tk):
         self.youtube_var = tk.BooleanVar()
         self.no_resume_var = tk.BooleanVar()
         self.quality_var = tk.StringVar()
-        self.pause_event = threading.Event()
         self.cancel_event = threading.Event()
+        # Workers block on this while paused; pause and cancel both notify it
+        self._pause_cond = threading.Condition()
+        self._paused = False
         self._is_downloading = False
         self._progress_stats = None
+        # Latest (maximum, value, text) from the worker, drained by the UI thread
+        self._pending_progress = None
+        self._progress_lock = threading.Lock()
+        self._drain_job = None
+        # url -> (extracted_at, info) so one extraction serves the quality
+        # list, the filename auto-detect and the download itself
+        self._info_cache = {}
+        self._info_lock = threading.Lock()
+        # url -> Event for extractions in flight, so callers wait on the
+        # same URL without holding the lock across the network fetch
+        self._info_pending = {}
+        # Idle YoutubeDL instances; reused to keep yt-dlp's player/JS caches
+        # warm, but never shared between two extractions at once
+        self._info_ydls = []
+        self._info_closed = False
+        self._format_cache = _load_format_cache()
+        self._format_lock = threading.Lock()
+        self._url_change_job = None
+        # Bumped per lookup so results for an outdated URL are discarded
+        self._quality_req_id = 0
+        # Combobox label -> yt-dlp format selector, so a download never re-parses labels
+        self._quality_map = dict(DEFAULT_QUALITIES)
 
         self.url_var.trace_add("write", lambda *args: self._on_url_change())
 
         self._create_widgets()
 
     def _on_url_change(self):
-        # If YouTube mode is on and URL changes, repopulate qualities
+        # If YouTube mode is on and URL changes, repopulate qualities once
+        # the edits stop, so typing or pasting only triggers one lookup
+        if self._url_change_job:
+            self.after_cancel(self._url_change_job)
+            self._url_change_job = None
         if self.youtube_var.get():
-            self._populate_youtube_qualities()
+            self._url_change_job = self.after(URL_DEBOUNCE_MS, self._populate_youtube_qualities)
 
     def _create_widgets(self) -> None:
         ttk.Label(self, text="URL:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
@@ -57,9 +184,8 @@ class DownloaderGUI(tk.Tk):
         )
 
         ttk.Label(self, text="Quality:").grid(row=3, column=0, sticky="e", padx=5, pady=5)
-        quality_options = ["best", "worst", "144p", "240p", "360p", "480p", "720p", "1080p"]
         self.quality_var.set("best")
-        self.quality_combo = ttk.Combobox(self, textvariable=self.quality_var, values=quality_options, state="readonly", width=10)
+        self.quality_combo = ttk.Combobox(self, textvariable=self.quality_var, values=list(self._quality_map), state="readonly", width=10)
         self.quality_combo.grid(row=3, column=1, sticky="w", padx=5, pady=5)
         self.quality_label = ttk.Label(self, text="Quality:")
         self.quality_label.grid(row=3, column=0, sticky="e", padx=5, pady=5)
@@ -94,43 +220,101 @@ class DownloaderGUI(tk.Tk):
             self.quality_label.grid_remove()
             self.quality_combo.grid_remove()
 
+    def _get_info(self, url: str) -> dict:
+        """Return the yt-dlp info dict for url, extracting it at most once per TTL."""
+        while True:
+            with self._info_lock:
+                cached = self._info_cache.get(url)
+                if cached and time.time() - cached[0] < INFO_CACHE_TTL:
+                    return cached[1]
+                pending = self._info_pending.get(url)
+                if pending is None:
+                    pending = self._info_pending[url] = threading.Event()
+                    ydl = self._info_ydls.pop() if self._info_ydls else None
+                    break
+            # Another thread is extracting this URL; use its result (or retry if it failed)
+            pending.wait()
+        try:
+            if ydl is None:
+                ydl = yt_dlp.YoutubeDL({'quiet': True})
+            info = ydl.extract_info(url, download=False)
+            with self._info_lock:
+                self._info_cache[url] = (time.time(), info)
+            return info
+        finally:
+            with self._info_lock:
+                del self._info_pending[url]
+                if ydl is not None and not self._info_closed:
+                    self._info_ydls.append(ydl)
+                    ydl = None
+            pending.set()
+            if ydl is not None:
+                ydl.close()  # Window already destroyed
+
+    def destroy(self) -> None:
+        with self._info_lock:
+            self._info_closed = True
+            ydls, self._info_ydls = self._info_ydls, []
+        for ydl in ydls:
+            ydl.close()
+        super().destroy()
+
+    def _get_formats(self, url: str) -> list:
+        """Return the trimmed muxed formats for url, using the on-disk cache when fresh."""
+        with self._format_lock:
+            cached = self._format_cache.get(url)
+            if cached and time.time() - cached[0] < FORMAT_CACHE_TTL:
+                return cached[1]
+        info = self._get_info(url)
+        formats = [
+            {field: f.get(field) for field in FORMAT_FIELDS}
+            for f in info.get('formats', [])
+            if f.get('vcodec') != 'none' and f.get('acodec') != 'none' and f.get('ext') in ('mp4', 'webm', 'mkv')
+        ]
+        with self._format_lock:
+            self._format_cache[url] = [time.time(), formats]
+            _save_format_cache(self._format_cache)
+        return formats
+
     def _populate_youtube_qualities(self):
+        self._url_change_job = None
+        self._quality_req_id += 1
         url = self.url_var.get().strip()
-        self.quality_combo['values'] = ['Updating...']
-        self.quality_var.set('Updating...')
-        self.quality_combo.update_idletasks()
-        self.status_label.config(text="Fetching available video qualities...")
-        self.update_idletasks()
         if not url:
             self.quality_combo['values'] = []
             self.quality_var.set('')
             return
+        self.quality_combo['values'] = ['Updating...']
+        self.quality_var.set('Updating...')
+        self.status_label.config(text="Fetching available video qualities...")
+        threading.Thread(
+            target=self._fetch_qualities_worker, args=(url, self._quality_req_id), daemon=True
+        ).start()
+
+    def _fetch_qualities_worker(self, url: str, token: int) -> None:
         try:
-            import yt_dlp
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                formats = info.get('formats', [])
-                video_formats = []
-                for f in formats:
-                    if f.get('vcodec') != 'none' and f.get('acodec') != 'none' and f.get('ext') in ('mp4', 'webm', 'mkv'):
-                        height = f.get('height')
-                        fps = f.get('fps')
-                        ext = f.get('ext')
-                        format_id = f.get('format_id')
-                        note = f.get('format_note', '')
-                        label = f"{format_id} - {height}p {note} {ext}"
-                        video_formats.append(label)
-                if video_formats:
-                    self.quality_combo['values'] = video_formats
-                    self.quality_var.set(video_formats[0])
-                else:
-                    self.quality_combo['values'] = ['best']
-                    self.quality_var.set('best')
-            self.status_label.config(text="Available qualities updated.")
+            quality_map = {
+                f"{f.get('format_id')} - {f.get('height')}p {f.get('format_note') or ''} {f.get('ext')}": f.get('format_id')
+                for f in self._get_formats(url)
+            }
         except Exception:
-            self.quality_combo['values'] = ['best']
-            self.quality_var.set('best')
+            quality_map = None
+        self.after(0, self._apply_qualities, token, quality_map)
+
+    def _apply_qualities(self, token: int, quality_map) -> None:
+        if token != self._quality_req_id:
+            return  # the URL changed while this lookup was running
+        failed = quality_map is None
+        if not quality_map:
+            quality_map = {'best': 'best'}
+        self._quality_map = quality_map
+        labels = list(quality_map)
+        self.quality_combo['values'] = labels
+        self.quality_var.set(labels[0])
+        if failed:
             self.status_label.config(text="Could not fetch video qualities.")
+        else:
+            self.status_label.config(text="Available qualities updated.")
 
     def _start_download(self) -> None:
         url = self.url_var.get().strip()
@@ -138,32 +322,8 @@ class DownloaderGUI(tk.Tk):
         is_youtube = self.youtube_var.get()
         no_resume = self.no_resume_var.get()
 
-        # Auto-detect output filename if not provided
-        if not output:
-            try:
-                import mimetypes
-                import os
-                from urllib.parse import urlparse
-                import requests
-                if is_youtube:
-                    import yt_dlp
-                    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                        info = ydl.extract_info(url, download=False)
-                        title = info.get('title', 'youtube_video')
-                        ext = info.get('ext', 'mp4')
-                        basename = f"{title}.{ext}"
-                else:
-                    basename = os.path.basename(urlparse(url).path)
-                    if not basename or '.' not in basename:
-                        resp = requests.head(url, allow_redirects=True, timeout=5)
-                        content_type = resp.headers.get('content-type', '').split(';')[0]
-                        ext = mimetypes.guess_extension(content_type) or ''
-                        basename = 'downloaded_file' + ext
-                output = basename
-                self.output_var.set(output)
-            except Exception:
-                output = 'downloaded_file'
-                self.output_var.set(output)
+        # Without an output file the worker names the download: files from
+        # the response headers, YouTube videos from yt-dlp's own metadata.
 
         self.progress["value"] = 0
         self.progress["maximum"] = 100
@@ -173,8 +333,10 @@ class DownloaderGUI(tk.Tk):
         self.pause_btn['text'] = 'Pause'
         self.cancel_btn['state'] = tk.NORMAL
         self.cancel_event.clear()
-        self.pause_event.set()  # Not paused by default
+        self._paused = False
         self._is_downloading = True
+        self._stop_progress_drain()
+        self._drain_job = self.after(PROGRESS_INTERVAL_MS, self._drain_progress)
 
         thread = threading.Thread(
             target=self._download_with_error_handling, args=(url, output, is_youtube, no_resume), daemon=True
@@ -184,22 +346,32 @@ class DownloaderGUI(tk.Tk):
     def _toggle_pause(self):
         if not self._is_downloading:
             return
-        if self.pause_event.is_set():
-            self.pause_event.clear()
+        with self._pause_cond:
+            self._paused = not self._paused
+            self._pause_cond.notify_all()
+        if self._paused:
             self.pause_btn['text'] = 'Resume'
             self.status_label.config(text="Paused")
         else:
-            self.pause_event.set()
             self.pause_btn['text'] = 'Pause'
 
     def _cancel_download(self):
         if self._is_downloading:
             self.cancel_event.set()
+            with self._pause_cond:
+                self._pause_cond.notify_all()
             self.status_label.config(text="Cancelling download...")
 
     def _set_download_button_state(self, enabled: bool) -> None:
         self.download_btn['state'] = tk.NORMAL if enabled else tk.DISABLED
 
+    def _wait_if_paused(self) -> None:
+        """Block while paused and raise once the download is cancelled."""
+        with self._pause_cond:
+            self._pause_cond.wait_for(lambda: not self._paused or self.cancel_event.is_set())
+        if self.cancel_event.is_set():
+            raise Exception("Download cancelled by user.")
+
     def _download_with_error_handling(self, url, output, is_youtube, no_resume):
         try:
             self._download(url, output, is_youtube, no_resume)
@@ -208,29 +380,26 @@ class DownloaderGUI(tk.Tk):
 
     def _download(self, url: str, output: str, is_youtube: bool, no_resume: bool) -> None:
         def progress_callback(downloaded, total):
-            import time
-            # Check for cancel before updating progress
-            if self.cancel_event.is_set():
-                raise Exception("Download cancelled by user.")
-            while not self.pause_event.is_set():
-                if self.cancel_event.is_set():
-                    raise Exception("Download cancelled by user.")
-                time.sleep(0.1)
-            if self.cancel_event.is_set():
-                raise Exception("Download cancelled by user.")
+            self._wait_if_paused()
             self._progress_callback(downloaded, total)
 
         cancelled = False
         success = False
+        error = None
         try:
             if is_youtube:
-                import re
-                match = re.match(r"(\d+)", self.quality_var.get())
-                format_id = match.group(1) if match else 'best'
+                format_id = self._quality_map.get(self.quality_var.get(), 'best')
+                last_hook_ts = 0.0
                 def yt_progress_hook(d):
+                    nonlocal last_hook_ts
                     if self.cancel_event.is_set():
                         raise Exception("Download cancelled by user.")
                     if d.get('status') == 'downloading':
+                        # yt-dlp fires this per buffer; 'finished' is never skipped
+                        now = time.monotonic()
+                        if now - last_hook_ts < YT_HOOK_INTERVAL:
+                            return
+                        last_hook_ts = now
                         downloaded = d.get('downloaded_bytes', 0)
                         total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
                         progress_callback(downloaded, total)
@@ -240,52 +409,109 @@ class DownloaderGUI(tk.Tk):
                 ydl_opts = {
                     'format': format_id,
                     'progress_hooks': [yt_progress_hook],
-                    'outtmpl': output
+                    'outtmpl': output or YOUTUBE_OUTTMPL,
+                    'concurrent_fragment_downloads': DEFAULT_CONCURRENT_FRAGMENTS,
+                    'writeinfojson': False,
+                    'skip_download': False,
                 }
-                import yt_dlp
+                info = self._get_info(url)
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([url])
+                    # Re-run format selection on the cached info instead of re-extracting
+                    result = ydl.process_ie_result(ydl.sanitize_info(info), download=True)
+                downloads = result.get('requested_downloads') or [{}]
+                filepath = downloads[0].get('filepath')
+                if filepath:
+                    # Queued ahead of _download_done, which opens output_var
+                    self.after(0, self.output_var.set, filepath)
                 success = True
             else:
-                # For file downloads, we must chunk the download and check cancel/pause between chunks
-                import requests
-                import os
-                from tqdm import tqdm
-                headers = {}
-                initial_pos = 0
-                if os.path.exists(output) and not no_resume:
-                    initial_pos = os.path.getsize(output)
-                    headers['Range'] = f'bytes={initial_pos}-'
-                resp = requests.get(url, stream=True, headers=headers)
-                total = int(resp.headers.get('content-length', 0))
-                mode = 'ab' if initial_pos > 0 else 'wb'
-                downloaded = initial_pos
-                chunk_size = 1024 * 32
-                with open(output, mode) as f:
-                    for chunk in resp.iter_content(chunk_size=chunk_size):
-                        if self.cancel_event.is_set():
-                            raise Exception("Download cancelled by user.")
-                        while not self.pause_event.is_set():
-                            if self.cancel_event.is_set():
-                                raise Exception("Download cancelled by user.")
-                            time.sleep(0.1)
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            progress_callback(downloaded, total)
-                success = True
+                success, error = self._download_file(url, output, no_resume, progress_callback)
         except Exception as e:
-            if str(e) == "Download cancelled by user.":
+            if str(e) == "Download cancelled by user." or self.cancel_event.is_set():
                 cancelled = True
             else:
-                import traceback
                 print(traceback.format_exc())
         if cancelled:
             self.after(0, self._download_cancelled)
         else:
-            self.after(0, self._download_done, success, None)
+            self.after(0, self._download_done, success, error)
+
+    def _download_file(self, url, output, no_resume, progress_callback):
+        """Download a direct file link; returns (success, error message or None).
+
+        Mirrors download_file: the resume GET's status decides what happens,
+        206 appends, 200 (Range ignored) starts over, 416 means nothing is
+        left to fetch.
+        """
+        # For file downloads, we must chunk the download and check cancel/pause between chunks
+        resp = None
+        if not output:
+            # Content-Disposition can name the file, so open the stream first
+            resp = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+            output = _filename_from_response(resp, url, require_extension=True)
+            self.after(0, self.output_var.set, output)
+        initial_pos = 0
+        if os.path.exists(output) and not no_resume:
+            initial_pos = os.path.getsize(output)
+        if initial_pos and resp is not None:
+            # Opened without a Range header; reopen from the offset
+            resp.close()
+            resp = None
+        if resp is None:
+            headers = {}
+            if initial_pos:
+                headers = {'Range': f'bytes={initial_pos}-', 'Accept-Encoding': 'identity'}
+            resp = _SESSION.get(url, stream=True, headers=headers, timeout=REQUEST_TIMEOUT)
+        if initial_pos and resp.status_code == 416:
+            # Range starts at or past the end: already fully downloaded
+            resp.close()
+            progress_callback(initial_pos, initial_pos)
+            return True, None
+        if resp.status_code == 206 and _is_encoded(resp):
+            # Server compressed the range anyway; it can't be appended
+            resp.close()
+            resp = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+        if resp.status_code not in (200, 206):
+            resp.close()
+            return False, f"HTTP {resp.status_code}"
+        if resp.status_code == 200:
+            initial_pos = 0  # Full body: fresh download, or the server ignored Range
+
+        total = _response_total_size(resp, initial_pos)
+        wire_size = total or int(resp.headers.get('content-length', 0))
+        if wire_size and not 0 < wire_size < MAX_FILE_SIZE:
+            resp.close()
+            return False, "File size too large (max 10GB)"
+
+        # Large fresh downloads go over parallel range requests
+        accepts_ranges = resp.headers.get('accept-ranges', '').lower() == 'bytes'
+        if not initial_pos and accepts_ranges and total > SEGMENT_SIZE:
+            resp.close()
+            if _download_segmented(url, output, total, progress_callback, resume=not no_resume):
+                return True, None
+            resp = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+
+        mode = 'ab' if initial_pos > 0 else 'wb'
+        downloaded = initial_pos
+        last_reported = initial_pos
+        with open(output, mode, buffering=WRITE_BUFFER_SIZE) as f:
+            # read1 yields per socket read, so keep the loop body lean
+            write = f.write
+            wait_if_paused = self._wait_if_paused
+            for chunk in _iter_available(resp, DEFAULT_CHUNK_SIZE):
+                wait_if_paused()
+                if chunk:
+                    write(chunk)
+                    downloaded += len(chunk)
+                    if downloaded - last_reported >= PROGRESS_CHUNK_SIZE:
+                        last_reported = downloaded
+                        progress_callback(downloaded, total)
+        if downloaded != last_reported:
+            progress_callback(downloaded, total)
+        return True, None
 
     def _download_cancelled(self):
+        self._stop_progress_drain()
         self._set_download_button_state(True)
         self.pause_btn['state'] = tk.DISABLED
         self.cancel_btn['state'] = tk.DISABLED
@@ -295,19 +521,20 @@ class DownloaderGUI(tk.Tk):
         self._progress_stats = None
 
     def _progress_callback(self, downloaded: int, total: int) -> None:
-        import time
+        now = time.time()
         if not self._progress_stats:
             self._progress_stats = {
-                'start_time': time.time(),
-                'last_time': time.time(),
+                'start_time': now,
+                'last_time': now,
                 'last_downloaded': 0,
                 'speed': 0,
                 'eta': None
             }
         stats = self._progress_stats
-        now = time.time()
-        elapsed = now - stats['start_time']
         recent_elapsed = now - stats['last_time']
+        # Coalesce bursts of chunks; the final update always goes through
+        if recent_elapsed < PROGRESS_INTERVAL_MS / 1000 and downloaded != total:
+            return
         recent_bytes = downloaded - stats['last_downloaded']
         if recent_elapsed > 0:
             speed = recent_bytes / recent_elapsed
@@ -322,49 +549,44 @@ class DownloaderGUI(tk.Tk):
             eta = None
         stats['eta'] = eta
         percent = (downloaded / total * 100) if total > 0 else 0
-        self.after(0, self._update_progress, downloaded, total, percent, speed, eta)
-
-    def _update_progress(self, downloaded: int, total: int, percent: float, speed: float, eta: float) -> None:
-        def format_bytes(num):
-            for unit in ['B','KB','MB','GB','TB']:
-                if num < 1024.0:
-                    return f"{num:.2f} {unit}"
-                num /= 1024.0
-            return f"{num:.2f} PB"
-        def format_time(seconds):
-            if seconds is None or seconds == float('inf'):
-                return 'N/A'
-            m, s = divmod(int(seconds), 60)
-            h, m = divmod(m, 60)
-            if h:
-                return f"{h}h {m}m {s}s"
-            elif m:
-                return f"{m}m {s}s"
-            else:
-                return f"{s}s"
+        # Strings are built here so the UI thread only has to set them
+        speed_str = _format_bytes(speed) + "/s" if speed else "N/A"
         if total > 0:
-            self.progress["maximum"] = total
-            self.progress["value"] = downloaded
-            speed_str = format_bytes(speed) + "/s" if speed else "N/A"
-            eta_str = format_time(eta)
-            self.status_label.config(
-                text=f"{percent:.1f}% | {format_bytes(downloaded)} / {format_bytes(total)} | {speed_str} | ETA: {eta_str}"
-            )
+            maximum, value = total, downloaded
+            text = f"{percent:.1f}% | {_format_bytes(downloaded)} / {_format_bytes(total)} | {speed_str} | ETA: {_format_time(eta)}"
         else:
             # Indeterminate mode for unknown total
-            self.progress["maximum"] = 100
+            maximum = 100
             # Use percent as a fallback, but if total is 0, show bytes
-            if downloaded > 0:
-                self.progress["value"] = min(100, percent)
-            else:
-                self.progress["value"] = 0
-            speed_str = format_bytes(speed) + "/s" if speed else "N/A"
-            self.status_label.config(
-                text=f"{format_bytes(downloaded)} | {speed_str}"
-            )
+            value = min(100, percent) if downloaded > 0 else 0
+            text = f"{_format_bytes(downloaded)} | {speed_str}"
+        with self._progress_lock:
+            self._pending_progress = (maximum, value, text)
+
+    def _drain_progress(self) -> None:
+        with self._progress_lock:
+            pending, self._pending_progress = self._pending_progress, None
+        if pending:
+            self._update_progress(*pending)
+        if self._is_downloading:
+            self._drain_job = self.after(PROGRESS_INTERVAL_MS, self._drain_progress)
+        else:
+            self._drain_job = None
+
+    def _stop_progress_drain(self) -> None:
+        if self._drain_job:
+            self.after_cancel(self._drain_job)
+            self._drain_job = None
+        with self._progress_lock:
+            self._pending_progress = None
+
+    def _update_progress(self, maximum: float, value: float, text: str) -> None:
+        # One configure call per widget keeps this to a single redraw per tick
+        self.progress.configure(maximum=maximum, value=value)
+        self.status_label.config(text=text)
 
     def _download_done(self, success: bool, error: str = None) -> None:
-        import os
+        self._stop_progress_drain()
         self._set_download_button_state(True)
         self.pause_btn['state'] = tk.DISABLED
         self.cancel_btn['state'] = tk.DISABLED
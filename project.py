@@ -11,13 +11,90 @@ Features:
 
 
 import argparse
+import json
+import math
+import multiprocessing
 import os
+import queue
+import re
+import shutil
+import socket
+import sys
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial
+from email.message import EmailMessage
 from urllib.parse import urlparse
-from typing import Callable, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 import mimetypes
 import yt_dlp
 from tqdm import tqdm
+from tqdm.utils import CallbackIOWrapper
+
+try:
+    import httpx  # Optional: multiplexes segment requests over HTTP/2
+except ImportError:
+    httpx = None
+
+# Failures reported as network errors, whichever client made the request
+_NETWORK_ERRORS = (requests.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+
+MAX_FILE_SIZE = 10 * 1024 * 1024 * 1024  # 10GB
+SEGMENT_SIZE = 8 * 1024 * 1024  # 8MB per connection
+MAX_SEGMENTS = 8
+DEFAULT_CONNECTIONS = min(MAX_SEGMENTS, (os.cpu_count() or 1) * 2)
+DEFAULT_JOBS = 4  # URLs downloaded at the same time from the command line
+DEFAULT_CONCURRENT_FRAGMENTS = 4  # parallel HLS/DASH fragments per video
+ARIA2C_ARGS = ['-x', '16', '-k', '1M', '-s', '16']
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # bytes read from the socket per iteration
+DEFAULT_PROGRESS_CHUNK_SIZE = 1024 * 1024  # bytes between progress callbacks
+BAR_UPDATE_SIZE = 256 * 1024  # bytes batched before a tqdm update
+BAR_UPDATE_INTERVAL = 0.1  # seconds before batched bytes are flushed anyway
+TICKER_INTERVAL = 0.1  # seconds between redraws of the --quiet/batch status line
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+BACKGROUND_WRITE_THRESHOLD = 64 * 1024 * 1024  # files this big write on a helper thread
+WRITE_QUEUE_DEPTH = 8  # chunks buffered between the network and the disk thread
+STATE_SAVE_SIZE = 16 * 1024 * 1024  # bytes a segment writes between durable .part.json saves
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds
+POOL_SIZE = 16  # kept-alive connections per host, enough for every segment
+# Fixed SO_RCVBUF for download sockets, in bytes. None leaves the kernel's
+# receive-buffer autotuning on: on Linux an explicit value disables it and is
+# capped by net.core.rmem_max, which is often far below what autotuning reaches
+RECV_BUFFER_SIZE = None
+# Transient gateway errors are retried with 0.3s, 0.6s, 1.2s backoff; the last
+# response is returned rather than raised so callers still see its status
+RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False)
+# Media types that mean the URL is a web page rather than a file
+REJECTED_CONTENT_TYPES = frozenset({'text/html', 'application/xhtml+xml'})
+# Cheap shape check run before urlparse; anything it rejects never hits the network
+_URL_RE = re.compile(r'^https?://[^\s/$.?#][^\s]*$', re.IGNORECASE)
+
+
+class _DownloadAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets can be given a fixed receive buffer (RECV_BUFFER_SIZE)"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        if RECV_BUFFER_SIZE:
+            kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE),
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+# One session for every request so TCP/TLS connections are reused between
+# the HEAD, the GET and the parallel range requests
+_SESSION = requests.Session()
+for _prefix in ('http://', 'https://'):
+    _SESSION.mount(_prefix, _DownloadAdapter(
+        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRY
+    ))
 
 
 def main() -> int:
@@ -32,60 +109,621 @@ def main() -> int:
         epilog="""
 Examples:
   Regular file: python project.py https://example.com/file.txt
+  Several files: python project.py https://example.com/a.zip https://example.com/b.zip
   YouTube: python project.py --youtube https://youtube.com/watch?v=ID 
         """
     )
-    parser.add_argument("url", help="URL to download from")
+    parser.add_argument("urls", nargs="+", metavar="url", help="URL(s) to download from")
     parser.add_argument("-o", "--output", help="Output filename")
     parser.add_argument(
         "--youtube", 
         action="store_true", 
         help="Use YouTube download mode"
     )
+    parser.add_argument(
+        "--connections",
+        type=_positive_int,
+        default=DEFAULT_CONNECTIONS,
+        help=f"Parallel connections for large files, at most {MAX_SEGMENTS} "
+             f"(default: {DEFAULT_CONNECTIONS})"
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Share one HTTP/2 connection between parallel connections (needs httpx[http2])"
+    )
+    parser.add_argument(
+        "--concurrent-fragments",
+        type=_positive_int,
+        help=f"Parallel fragments for HLS/DASH videos (default: {DEFAULT_CONCURRENT_FRAGMENTS})"
+    )
+    parser.add_argument(
+        "--external-downloader",
+        choices=["none", "aria2c"],
+        default="none",
+        help="Hand YouTube downloads to aria2c if it is on PATH"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Download again even if a previous download is still current"
+    )
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="Show one status line instead of a progress bar per file"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=_positive_int,
+        default=DEFAULT_JOBS,
+        help=f"URLs to download at the same time; YouTube URLs each get "
+             f"their own process (default: {DEFAULT_JOBS})"
+    )
 
     args = parser.parse_args()
+    if args.output and len(args.urls) > 1:
+        parser.error("-o/--output can only be used with a single URL")
 
     try:
         if args.youtube:
-            success = download_youtube(args.url)
+            external = None if args.external_downloader == "none" else args.external_downloader
+            results = download_youtube_batch(
+                args.urls,
+                jobs=args.jobs,
+                concurrent_fragments=args.concurrent_fragments,
+                external_downloader=external,
+            )
         else:
             # Provide default resume=True, as there is no args.no_resume
-            success = download_file(
-                args.url,
-                args.output,
-                resume=True
+            results = download_files(
+                args.urls,
+                jobs=args.jobs,
+                quiet=args.quiet,
+                filename=args.output,
+                resume=True,
+                connections=args.connections,
+                use_cache=not args.no_cache,
+                http2=args.http2,
             )
-        if not success:
+        if not all(results):
             return 1
         return 0
     except KeyboardInterrupt:
         print("\nDownload cancelled by user")
         return 1
 
+def _positive_int(value: str) -> int:
+    """argparse type for options that need a count of at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 def _validate_file_size(size: int) -> bool:
     """Check if file size is within reasonable limits (< 10GB)"""
-    MAX_SIZE = 10 * 1024 * 1024 * 1024  # 10GB
-    return 0 < size < MAX_SIZE
+    return 0 < size < MAX_FILE_SIZE
 
     # (Removed duplicate definition)
-def _get_remote_file_info(url: str) -> Tuple[int, str]:
-    """Helper function to get file size and content type"""
+def _get_remote_file_info(url: str) -> Tuple[int, str, bool]:
+    """
+    Helper function to get file size, content type and range support.
+
+    Asks for the first byte only: a 206 answer carries the full size in
+    Content-Range and proves range support in the same round trip, and
+    servers that reject HEAD still answer it.
+    """
     try:
-        response = requests.head(url, allow_redirects=True)
-        size = int(response.headers.get('content-length', 0))
-        if size and not _validate_file_size(size):
-            raise ValueError("File size too large (max 10GB)")
-        content_type = response.headers.get('content-type', '').lower()
-        return size, content_type
+        response = _SESSION.get(
+            url, stream=True, allow_redirects=True, timeout=REQUEST_TIMEOUT,
+            headers={'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'},
+        )
+        response.close()  # Only the headers are needed
     except requests.RequestException:
-        # If HEAD request fails, return defaults so download can continue
-        return 0, ''
+        # If the probe fails, return defaults so download can continue
+        return 0, '', False
+    try:
+        size = _response_total_size(response, 0)
+        # A compressed body's size is unknown, but its wire size still counts
+        wire_size = size or int(response.headers.get('content-length', 0))
+    except ValueError:
+        size = wire_size = 0  # Malformed length header: size unknown
+    if wire_size and not 0 < wire_size < MAX_FILE_SIZE:
+        raise ValueError("File size too large (max 10GB)")
+    accepts_ranges = (response.status_code == 206
+                      or response.headers.get('accept-ranges', '').lower() == 'bytes')
+    content_type = response.headers.get('content-type', '').lower()
+    return size, content_type, accepts_ranges
+
+
+def _media_type(response: requests.Response) -> str:
+    """Helper function to get the bare, lower-case media type, without parameters"""
+    return response.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+
+
+def _is_encoded(response: requests.Response) -> bool:
+    """True if the body is sent compressed (gzip, br, ...) and decoded by urllib3"""
+    return response.headers.get('content-encoding', 'identity').lower() != 'identity'
+
+
+def _response_total_size(response: requests.Response, initial_pos: int) -> int:
+    """
+    Helper function to get the full file size from a GET response.
+
+    Returns 0 (unknown) for compressed bodies, whose Content-Length counts
+    bytes on the wire rather than bytes written to disk.
+    """
+    if _is_encoded(response):
+        return 0
+    if response.status_code == 206:
+        # Content-Range: bytes <start>-<end>/<total>
+        total = str(response.headers.get('content-range', '')).rpartition('/')[2]
+        if total.isdigit():
+            return int(total)
+        return initial_pos + int(response.headers.get('content-length', 0))
+    return int(response.headers.get('content-length', 0))
+
+
+def _preallocate(file, size: int) -> None:
+    """Reserve size bytes on disk for file, falling back to a sparse truncate"""
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            # Allocates real extents up front so segment writes never grow the file
+            os.posix_fallocate(file.fileno(), 0, size)
+            return
+        except OSError:
+            pass  # Filesystem without fallocate support
+    file.truncate(size)
+
+
+def _filename_from_response(
+    response: requests.Response, url: str, require_extension: bool = False
+) -> str:
+    """
+    Helper function to name a download from Content-Disposition, the URL or its type.
+
+    With require_extension, a URL basename without a '.' (e.g. /get) is not
+    trusted and the name is built from the content type instead.
+    """
+    disposition = response.headers.get('content-disposition', '')
+    if disposition:
+        message = EmailMessage()
+        message['content-disposition'] = disposition
+        # Never let the server pick a directory
+        name = os.path.basename(message.get_filename() or '')
+        if name not in ('', '.', '..'):
+            return name
+    name = os.path.basename(urlparse(url).path)
+    if name not in ('', '.', '..') and ('.' in name or not require_extension):
+        return name
+    return 'downloaded_file' + (mimetypes.guess_extension(_media_type(response)) or '')
+
+
+class _BackgroundWriter:
+    """
+    File-like wrapper that hands writes to a dedicated thread, so blocking
+    disk writeback overlaps with reading the next chunk from the network.
+    """
+
+    def __init__(self, file, depth: int = WRITE_QUEUE_DEPTH) -> None:
+        self._file = file
+        self._queue = queue.Queue(maxsize=depth)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(data)
+                except BaseException as e:
+                    # Keep draining so a producer blocked on put() wakes up
+                    self._error = e
+
+    def write(self, data: bytes) -> int:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Wait for queued writes to land and re-raise any write error"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+class _CoalescedProgress:
+    """
+    Batches byte counts in front of a tqdm bar; every tqdm.update takes a
+    lock and may redraw, which is wasted work for small reads.
+    """
+
+    def __init__(self, bar: tqdm, size: int = BAR_UPDATE_SIZE,
+                 interval: float = BAR_UPDATE_INTERVAL) -> None:
+        self._bar = bar
+        self._size = size
+        self._interval = interval
+        self._pending = 0
+        self._last = time.monotonic()
+
+    def update(self, n: int) -> None:
+        self._pending += n
+        if self._pending >= self._size:
+            self.flush()
+        else:
+            now = time.monotonic()
+            if now - self._last >= self._interval:
+                self.flush(now)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        if self._pending:
+            self._bar.update(self._pending)
+            self._pending = 0
+        self._last = time.monotonic() if now is None else now
+
+
+class _ProgressTicker:
+    """
+    Single status line for many downloads, redrawn by one thread at a fixed
+    rate. Downloads only store their counters through the callbacks handed
+    out by callback(); nothing on their side takes a lock or touches stdout
+    except the occasional message passed to log().
+    """
+
+    def __init__(self, stream=None, interval: float = TICKER_INTERVAL) -> None:
+        self._stream = stream or sys.stdout
+        self._interval = interval
+        self._slots: List[List[int]] = []  # [downloaded, total] per download
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()  # keeps log() lines and redraws apart
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def callback(self) -> Callable[[int, int], None]:
+        """Register one download and return its progress_callback"""
+        slot = [0, 0]
+        self._slots.append(slot)
+
+        def update(downloaded: int, total: int) -> None:
+            slot[0] = downloaded
+            slot[1] = total
+        return update
+
+    def log(self, message: str) -> None:
+        """Print message on its own line above the status line"""
+        with self._write_lock:
+            self._stream.write(f"\r\x1b[K{message}\n")
+        self._render()
+
+    def __enter__(self) -> '_ProgressTicker':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._render()
+        self._stream.write('\n')
+        self._stream.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._render()
+
+    def _render(self) -> None:
+        done = sum(slot[0] for slot in self._slots)
+        total = sum(slot[1] for slot in self._slots)
+        finished = sum(1 for slot in self._slots if slot[1] and slot[0] >= slot[1])
+        with self._write_lock:
+            self._stream.write(
+                f"\r{finished}/{len(self._slots)} files  "
+                f"{tqdm.format_sizeof(done, 'B', 1024)}/{tqdm.format_sizeof(total, 'B', 1024)}"
+            )
+            self._stream.flush()
+
+
+def _http2_client(log: Callable[[str], None] = print) -> Optional['httpx.Client']:
+    """
+    Helper function to create an HTTP/2 client for segment requests, or None
+    (after telling the user) if httpx or its h2 extra is not installed.
+    Servers that only speak HTTP/1.1 are handled by httpx's own negotiation.
+    """
+    if httpx is not None:
+        try:
+            # Connection failures are retried by the transport; gateway
+            # errors are retried in _open_range, matching the session's RETRY
+            transport = httpx.HTTPTransport(
+                http2=True,
+                retries=RETRY.total,
+                limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+            )
+            return httpx.Client(
+                transport=transport,
+                follow_redirects=True,
+                timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+            )
+        except ImportError:
+            pass  # httpx without the h2 package
+    log("HTTP/2 needs 'pip install httpx[http2]', using HTTP/1.1 connections")
+    return None
+
+
+@contextmanager
+def _open_range(url: str, start: int, end: int, chunk_size: int, client=None):
+    """
+    Helper function to stream bytes start-end of url, over the shared session
+    or an HTTP/2 client. Yields the response and an iterator over its body.
+    """
+    headers = {'Range': f'bytes={start}-{end}', 'Accept-Encoding': 'identity'}
+    if client is not None:
+        for attempt in range(RETRY.total + 1):
+            with client.stream('GET', url, headers=headers) as response:
+                if attempt == RETRY.total or response.status_code not in RETRY.status_forcelist:
+                    yield response, response.iter_bytes(chunk_size)
+                    return
+            # Same 0.3s, 0.6s, 1.2s backoff the session applies to gateway errors
+            time.sleep(RETRY.backoff_factor * 2 ** attempt)
+    response = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT, headers=headers)
+    try:
+        yield response, response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
+
+
+# Output files being written by a download in this process. Two URLs that
+# map to one name (a/x.zip, b/x.zip) would otherwise corrupt each other
+_ACTIVE_FILES = set()
+_ACTIVE_LOCK = threading.Lock()
+
+
+def _claim_file(filename: str) -> bool:
+    """Helper function to reserve filename for one download; False if already taken"""
+    path = os.path.abspath(filename)
+    with _ACTIVE_LOCK:
+        if path in _ACTIVE_FILES:
+            return False
+        _ACTIVE_FILES.add(path)
+        return True
+
+
+def _release_file(filename: str) -> None:
+    with _ACTIVE_LOCK:
+        _ACTIVE_FILES.discard(os.path.abspath(filename))
+
+
+class _Stopped(Exception):
+    """Raised inside a download when its batch has been cancelled"""
+
+
+class _RangeNotSupported(Exception):
+    """Raised when the server answers a range request with the full body"""
+
+
+def _plan_segments(total_size: int, connections: int = MAX_SEGMENTS) -> List[Tuple[int, int]]:
+    """
+    Split [0, total_size) into inclusive byte ranges, one per connection.
+    At most MAX_SEGMENTS ranges are planned, which keeps every worker within
+    the session's connection pool.
+    """
+    count = max(1, min(connections, MAX_SEGMENTS, math.ceil(total_size / SEGMENT_SIZE)))
+    step = math.ceil(total_size / count)
+    return [
+        (start, min(start + step, total_size) - 1)
+        for start in range(0, total_size, step)
+    ]
+
+
+def _load_segment_state(state_name: str, part_name: str, url: str, total_size: int) -> Optional[List[List[int]]]:
+    """
+    Helper function to read the [start, end, done] progress of an interrupted
+    segmented download, or None if it does not match this download.
+    """
+    try:
+        with open(state_name, encoding='utf-8') as f:
+            state = json.load(f)
+        if (state['url'] == url and state['total'] == total_size
+                and os.path.getsize(part_name) == total_size):
+            return state['segments']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _save_segment_state(state_name: str, url: str, total_size: int, segments: List[List[int]]) -> None:
+    """
+    Helper function to record per-segment progress so a rerun can resume.
+    Written to a temporary file, fsynced and renamed into place, so a crash
+    leaves either the old state or the new one, never half of it.
+    """
+    tmp_name = state_name + '.tmp'
+    with open(tmp_name, 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'total': total_size, 'segments': segments}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, state_name)
+
+
+def _load_validators(filename: str, url: str) -> Optional[dict]:
+    """
+    Helper function to read the ETag/Last-Modified saved for a finished
+    download, or None if there is none or the file has changed since.
+    """
+    try:
+        with open(filename + '.meta.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['url'] == url and os.path.getsize(filename) == meta['size']:
+            return meta
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _save_validators(filename: str, url: str, response: requests.Response, size: int) -> None:
+    """Helper function to remember cache validators so a rerun can send a conditional GET"""
+    etag = response.headers.get('etag')
+    last_modified = response.headers.get('last-modified')
+    if not (etag or last_modified):
+        return
+    with open(filename + '.meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'etag': etag, 'last_modified': last_modified, 'size': size}, f)
+
+
+def _download_segmented(
+    url: str,
+    filename: str,
+    total_size: int,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    io_chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_chunk_size: int = DEFAULT_PROGRESS_CHUNK_SIZE,
+    connections: int = DEFAULT_CONNECTIONS,
+    resume: bool = True,
+    http2: bool = False,
+    stop_event: Optional[threading.Event] = None,
+    log: Callable[[str], None] = print,
+) -> bool:
+    """
+    Download a file over several parallel range requests.
+
+    Each segment is written to its own offset of a preallocated ``.part`` file,
+    which is renamed to ``filename`` once every segment has finished. If the
+    download stops early, per-segment progress is kept in ``.part.json`` and
+    a later call with ``resume`` only fetches what is still missing. With
+    ``http2`` the segments share one multiplexed connection where possible.
+    Setting ``stop_event`` makes every segment stop at its next chunk; the
+    progress so far is saved for resume and _Stopped is raised. Messages go
+    through ``log``.
+
+    Returns:
+        bool: True if the download completed, False if the server ignored
+        the Range header and the caller should fall back to a single stream
+    """
+    part_name = filename + '.part'
+    state_name = part_name + '.json'
+    segments = resume and _load_segment_state(state_name, part_name, url, total_size)
+    if segments:
+        log(f"Resuming segmented download of {filename}")
+    else:
+        segments = [[start, end, 0] for start, end in _plan_segments(total_size, connections)]
+        with open(part_name, 'wb') as file:
+            _preallocate(file, total_size)
+        # Saved straight away so even a killed process leaves a resumable .part
+        _save_segment_state(state_name, url, total_size, segments)
+    lock = threading.Lock()
+    # Progress known to be on disk; the checkpoint copy of segments
+    durable = [list(segment) for segment in segments]
+    state_lock = threading.Lock()
+    stop = threading.Event()
+    downloaded = sum(done for _, _, done in segments)
+    last_reported = downloaded
+
+    progress_bar = None
+    if not progress_callback:
+        progress_bar = tqdm(
+            desc=filename,
+            initial=downloaded,
+            total=total_size,
+            unit='iB',
+            unit_scale=True,
+            unit_divisor=1024,
+        )
+        bar_updates = _CoalescedProgress(progress_bar)
+
+    def checkpoint(index: int, file) -> None:
+        """Make a segment's writes durable, then record them in .part.json"""
+        file.flush()
+        os.fsync(file.fileno())
+        with state_lock:
+            durable[index][2] = segments[index][2]
+            _save_segment_state(state_name, url, total_size, durable)
+
+    def fetch(index: int) -> None:
+        nonlocal downloaded, last_reported
+        segment = segments[index]
+        start, end, done = segment
+        if start + done > end:
+            return
+        with _open_range(url, start + done, end, io_chunk_size, client) as (response, body):
+            if response.status_code != 206 or _is_encoded(response):
+                raise _RangeNotSupported()
+            # Each worker owns a handle, so seek + write never races another segment
+            with open(part_name, 'r+b', buffering=WRITE_BUFFER_SIZE) as file:
+                file.seek(start + done)
+                # Bound once; the loop body runs for every chunk
+                write = file.write
+                stopped = stop.is_set
+                cancelled = stop_event.is_set if stop_event is not None else bool
+                unsaved = 0
+                for data in body:
+                    if stopped():
+                        return
+                    if cancelled():
+                        raise _Stopped()
+                    size = write(data)
+                    with lock:
+                        segment[2] += size
+                        downloaded += size
+                        if progress_callback:
+                            if (downloaded - last_reported >= progress_chunk_size
+                                    or downloaded == total_size):
+                                last_reported = downloaded
+                                progress_callback(downloaded, total_size)
+                        else:
+                            bar_updates.update(size)
+                    unsaved += size
+                    if unsaved >= STATE_SAVE_SIZE:
+                        # Periodic save: SIGKILL or power loss skip the except below
+                        unsaved = 0
+                        checkpoint(index, file)
+
+    client = _http2_client(log) if http2 else None
+    try:
+        with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+            futures = [pool.submit(fetch, index) for index in range(len(segments))]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                stop.set()
+                raise
+    except _RangeNotSupported:
+        for name in (part_name, state_name):
+            if os.path.exists(name):
+                os.remove(name)
+        return False
+    except BaseException:
+        # Workers have closed (and flushed) their handles by now
+        _save_segment_state(state_name, url, total_size, segments)
+        raise
+    finally:
+        if client is not None:
+            client.close()
+        if progress_bar is not None:
+            bar_updates.flush()
+            progress_bar.close()
+
+    os.replace(part_name, filename)
+    if os.path.exists(state_name):
+        os.remove(state_name)
+    return True
+
 
 def download_file(
     url: str,
     filename: str = None,
     resume: bool = True,
     progress_callback: Optional[Callable[[int, int], None]] = None,
+    io_chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_chunk_size: int = DEFAULT_PROGRESS_CHUNK_SIZE,
+    connections: int = DEFAULT_CONNECTIONS,
+    use_cache: bool = True,
+    http2: bool = False,
+    stop_event: Optional[threading.Event] = None,
+    log: Callable[[str], None] = print,
 ) -> bool:
     """
     Download a file from the given URL with resume capability.
@@ -94,65 +732,154 @@ def download_file(
         url: URL to download from
         filename: Optional custom filename to save as
         resume: Whether to attempt resuming partial downloads
+        progress_callback: Optional callable receiving (downloaded, total)
+        io_chunk_size: Bytes read from the network per iteration
+        progress_chunk_size: Minimum bytes between progress_callback calls
+        connections: Parallel range requests used for large files
+        use_cache: Revalidate a previously finished download with a
+            conditional GET instead of fetching it again
+        http2: Multiplex the parallel range requests over HTTP/2 (needs httpx)
+        stop_event: Abandon the download, keeping what was written for
+            resume, once this event is set
+        log: Receives status and error messages instead of print
         
     Returns:
         bool: True if download successful, False otherwise
         
-    Raises:
-        ValueError: If file size exceeds limit
     """
+    claimed = None
     try:
-        if not validate_url(url):
-            print(f"Invalid or inaccessible URL: {url}")
-            return False
-            
-        # Get file info with size validation
-        try:
-            total_size, content_type = _get_remote_file_info(url)
-        except ValueError as e:
-            print(f"Error: {str(e)}")
+        # Only the URL shape is checked up front; the GET below doubles as
+        # the reachability check and supplies size and content type
+        if not validate_url_syntax(url):
+            log(f"Invalid or inaccessible URL: {url}")
             return False
-            
-        if 'text/html' in content_type:
-            print("Error: URL points to a webpage, not a downloadable file")
-            return False
-            
-        # Generate filename if needed
+
+        response = None
         if filename is None:
-            ext = mimetypes.guess_extension(content_type) or ''
-            filename = os.path.basename(url.split('?')[0]) or f'downloaded_file{ext}'
+            # The name may come from the response headers, so open the stream first
+            response = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+            filename = _filename_from_response(response, url)
+        if not _claim_file(filename):
+            if response is not None:
+                response.close()
+            log(f"Error: {filename} is already being downloaded from another URL")
+            return False
+        claimed = filename
         
         # Check if we can resume
         initial_pos = 0
-        if os.path.exists(filename) and resume:
+        validators = _load_validators(filename, url)
+        if validators is not None:
+            # Finished earlier; the server decides whether it is still current
+            headers = {}
+            if use_cache and validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if use_cache and validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+            mode = 'wb'
+        elif os.path.exists(filename) and resume:
             initial_pos = os.path.getsize(filename)
-            if total_size > 0 and initial_pos >= total_size:
-                print(f"File {filename} is already fully downloaded")
-                return True
-            
-            headers = {'Range': f'bytes={initial_pos}-'}
+            # Byte offsets only line up with the file on disk if uncompressed
+            headers = {'Range': f'bytes={initial_pos}-', 'Accept-Encoding': 'identity'}
             mode = 'ab'  # Append mode for resume
         else:
             if os.path.exists(filename):
-                response = input(f"File {filename} exists. Overwrite? (y/n): ")
-                if response.lower() != 'y':
-                    print("Download cancelled")
+                answer = input(f"File {filename} exists. Overwrite? (y/n): ")
+                if answer.lower() != 'y':
+                    log("Download cancelled")
                     return False
             headers = {}
             mode = 'wb'  # Write mode for fresh download
-            
+
         # Start download
-        response = requests.get(url, stream=True, headers=headers)
+        if response is not None and headers:
+            response.close()
+            response = None
+        if response is None:
+            response = _SESSION.get(
+                url, stream=True, headers=headers, timeout=REQUEST_TIMEOUT
+            )
+
+        if response.status_code == 304:
+            response.close()
+            log(f"File {filename} is up to date")
+            if progress_callback:
+                progress_callback(validators['size'], validators['size'])
+            return True
+        if response.status_code == 416 and initial_pos > 0:
+            # Range starts at or past the end: nothing left to fetch
+            response.close()
+            log(f"File {filename} is already fully downloaded")
+            if progress_callback:
+                progress_callback(initial_pos, initial_pos)
+            return True
+        if response.status_code not in (200, 206):
+            response.close()
+            log(f"Invalid or inaccessible URL: {url} (HTTP {response.status_code})")
+            return False
+
+        if response.status_code == 206 and _is_encoded(response):
+            # Server compressed the range anyway; it can't be appended
+            response.close()
+            response = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+
+        total_size = _response_total_size(response, initial_pos)
+        wire_size = total_size or int(response.headers.get('content-length', 0))
+        if wire_size and not 0 < wire_size < MAX_FILE_SIZE:
+            response.close()
+            log("Error: File size too large (max 10GB)")
+            return False
+
+        # A missing type is unknown, not rejected
+        if _media_type(response) in REJECTED_CONTENT_TYPES:
+            response.close()
+            log("Error: URL points to a webpage, not a downloadable file")
+            return False
+
+        # Large fresh downloads are split across parallel range requests
+        accepts_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
+        if mode == 'wb' and accepts_ranges and connections > 1 and total_size > SEGMENT_SIZE:
+            response.close()
+            if _download_segmented(
+                url, filename, total_size, progress_callback,
+                io_chunk_size, progress_chunk_size, connections, resume, http2,
+                stop_event, log,
+            ):
+                _save_validators(filename, url, response, total_size)
+                return True
+            log("Server ignored range request, using a single connection")
+            response = _SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT)
         
         if resume and response.status_code == 206:  # Partial content
-            print(f"Resuming download from {initial_pos} bytes")
+            log(f"Resuming download from {initial_pos} bytes")
         elif resume and initial_pos > 0:
-            print("Resume not supported by server, starting fresh download")
+            log("Resume not supported by server, starting fresh download")
             initial_pos = 0
             mode = 'wb'
             
-        # Download with progress bar
-        with open(filename, mode) as file, \
+        # Counted as the data is read, so no stat is needed to check the result
+        downloaded = initial_pos
+        last_reported = initial_pos
+
+        cancelled = stop_event.is_set if stop_event is not None else bool
+
+        def report(size: int) -> None:
+            nonlocal downloaded, last_reported
+            if cancelled():
+                raise _Stopped()
+            downloaded += size
+            if downloaded - last_reported >= progress_chunk_size:
+                last_reported = downloaded
+                progress_callback(downloaded, total_size)
+
+        # shutil runs the copy loop; progress is hooked onto each raw read
+        response.raw.decode_content = True
+
+        # Unlike the segmented .part file this one is not preallocated: resume
+        # takes its offset from the file size, so a zero-filled tail left by an
+        # interrupted run would be mistaken for downloaded data
+        with open(filename, mode, buffering=WRITE_BUFFER_SIZE) as file, \
              tqdm(
                  desc=filename,
                  initial=initial_pos,
@@ -160,66 +887,140 @@ def download_file(
                  unit='iB',
                  unit_scale=True,
                  unit_divisor=1024,
+                 disable=progress_callback is not None,
              ) as progress_bar:
-            
-            for data in response.iter_content(chunk_size=1024):
-                size = file.write(data)
-                progress_bar.update(size)
+            bar_updates = _CoalescedProgress(progress_bar)
+            bar_update = bar_updates.update
+
+            def count(size: int) -> None:
+                nonlocal downloaded
+                if cancelled():
+                    raise _Stopped()
+                downloaded += size
+                bar_update(size)
+
+            # The read hook is picked once rather than branching per chunk
+            reader = CallbackIOWrapper(report if progress_callback else count, response.raw, 'read')
+            try:
+                if total_size >= BACKGROUND_WRITE_THRESHOLD:
+                    writer = _BackgroundWriter(file)
+                    try:
+                        shutil.copyfileobj(reader, writer, length=io_chunk_size)
+                    finally:
+                        writer.close()
+                else:
+                    shutil.copyfileobj(reader, file, length=io_chunk_size)
+            finally:
+                bar_updates.flush()
+        if downloaded == 0 or (total_size and downloaded < total_size):
+            log("Error: Download failed - short or empty file")
+            return False
+        _save_validators(filename, url, response, downloaded)
         if progress_callback:
-            downloaded = initial_pos
-            with open(filename, mode) as file:
-                for data in response.iter_content(chunk_size=1024):
-                    size = file.write(data)
-                    downloaded += size
-                    progress_callback(downloaded, total_size)
             # Ensure completion is reported
-            progress_callback(total_size, total_size)
-        else:
-            with open(filename, mode) as file, \
-                 tqdm(
-                     desc=filename,
-                     initial=initial_pos,
-                     total=total_size,
-                     unit='iB',
-                     unit_scale=True,
-                     unit_divisor=1024,
-                 ) as progress_bar:
-                for data in response.iter_content(chunk_size=1024):
-                    size = file.write(data)
-                    progress_bar.update(size)
-        
-        if not os.path.exists(filename) or os.path.getsize(filename) == 0:
-            print("Error: Download failed - empty or missing file")
-            return False
+            progress_callback(total_size or downloaded, total_size or downloaded)
                 
         return True
         
-    except requests.RequestException as e:
-        print(f"Network error during download: {str(e)}")
+    except _Stopped:
+        # The batch was cancelled; whatever was written is kept for resume
+        return False
+    except _NETWORK_ERRORS as e:
+        log(f"Network error during download: {str(e)}")
         return False
     except IOError as e:
-        print(f"File error during download: {str(e)}")
+        log(f"File error during download: {str(e)}")
         return False
     except Exception as e:
-        print(f"Unexpected error during download: {str(e)}")
+        log(f"Unexpected error during download: {str(e)}")
         return False
+    finally:
+        if claimed is not None:
+            _release_file(claimed)
+
+
+def download_files(
+    urls: List[str], jobs: int = DEFAULT_JOBS, quiet: bool = False, **kwargs
+) -> List[bool]:
+    """
+    Download several URLs concurrently, one download_file call per URL.
+
+    A single interactive download gets a tqdm bar; in quiet mode, or when
+    several downloads share the terminal, one status line is drawn instead.
+
+    Args:
+        urls: URLs to download
+        jobs: Maximum number of downloads running at the same time
+        quiet: Use the single status line even for one URL
+        **kwargs: Passed through to download_file
 
+    Returns:
+        List[bool]: download_file's result for each URL, in input order
+    """
+    use_ticker = 'progress_callback' not in kwargs and (quiet or len(urls) > 1)
+    if len(urls) == 1 and not use_ticker:
+        return [download_file(urls[0], **kwargs)]
+    stop_event = threading.Event()
+    per_url = [dict(kwargs, stop_event=stop_event) for _ in urls]
+    ticker = None
+    if use_ticker:
+        ticker = _ProgressTicker()
+        # Every slot is registered before __enter__ starts the redraw thread
+        for url_kwargs in per_url:
+            url_kwargs.update(progress_callback=ticker.callback(), log=ticker.log)
+    with ticker or nullcontext():
+        pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+        try:
+            futures = [
+                pool.submit(download_file, url, **url_kwargs)
+                for url, url_kwargs in zip(urls, per_url)
+            ]
+            results = [future.result() for future in futures]
+        except KeyboardInterrupt:
+            # Ctrl-C only reaches this thread: drop queued downloads and tell
+            # running ones to stop at their next chunk rather than waiting
+            stop_event.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+    return results
 
 
     # (Removed duplicate definition)
 def download_youtube(
-    url: str, progress_callback: Optional[Callable[[int, int], None]] = None
+    url: str,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    concurrent_fragments: Optional[int] = None,
+    external_downloader: Optional[str] = None,
 ) -> bool:
     """
     Download a YouTube video at best available quality.
+
+    Args:
+        url: YouTube video URL
+        progress_callback: Optional callable receiving (downloaded, total)
+        concurrent_fragments: Parallel fragments for HLS/DASH formats
+            (defaults to DEFAULT_CONCURRENT_FRAGMENTS)
+        external_downloader: 'aria2c' to let aria2c fetch the media, if installed
     """
     try:
-        # Validate YouTube URL
-        if not validate_url(url) or 'youtube.com' not in url:
+        # Validate YouTube URL; yt-dlp reports unreachable pages itself
+        if not validate_url_syntax(url) or 'youtube.com' not in url:
             print("Invalid YouTube URL")
             return False
 
+        # Fragment options only matter for HLS/DASH, so say so if they were
+        # asked for explicitly but the chosen format is one plain stream
+        fragment_options_requested = concurrent_fragments is not None or bool(external_downloader)
+        warned = False
+
         def hook(d):
+            nonlocal warned
+            if fragment_options_requested and not warned and d.get('status') == 'downloading':
+                warned = True
+                if d.get('info_dict', {}).get('protocol') in ('http', 'https'):
+                    print("Note: selected format is a single progressive stream; "
+                          "fragment options have no effect")
             if progress_callback:
                 if d.get('status') == 'downloading':
                     downloaded = d.get('downloaded_bytes', 0)
@@ -233,8 +1034,15 @@ def download_youtube(
         ydl_opts = {
             'format': 'best',  # Use the best available format with both video and audio
             'progress_hooks': [hook],
-            'outtmpl': '%(title)s.%(ext)s'
+            'outtmpl': '%(title)s.%(ext)s',
+            'concurrent_fragment_downloads': concurrent_fragments or DEFAULT_CONCURRENT_FRAGMENTS,
         }
+        if external_downloader == 'aria2c':
+            if shutil.which('aria2c'):
+                ydl_opts['external_downloader'] = 'aria2c'
+                ydl_opts['external_downloader_args'] = ARIA2C_ARGS
+            else:
+                print("aria2c not found on PATH, using yt-dlp's own downloader")
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             print("Downloading video in best available quality...")
@@ -247,39 +1055,93 @@ def download_youtube(
         return False
 
 
+def _yt_download_one(
+    url: str,
+    concurrent_fragments: Optional[int] = None,
+    external_downloader: Optional[str] = None,
+) -> bool:
+    """Process pool entry point; must stay top-level so it can be pickled"""
+    return download_youtube(
+        url,
+        concurrent_fragments=concurrent_fragments,
+        external_downloader=external_downloader,
+    )
+
+
+def download_youtube_batch(urls: List[str], jobs: int = DEFAULT_JOBS, **kwargs) -> List[bool]:
+    """
+    Download several YouTube videos, each in its own process.
+
+    yt-dlp keeps a lot of per-instance state and does CPU work (signature
+    deciphering, muxing) under the GIL, so separate processes scale where
+    threads would not.
+
+    Args:
+        urls: YouTube video URLs
+        jobs: Maximum number of videos downloading at the same time
+        **kwargs: Passed through to download_youtube
+
+    Returns:
+        List[bool]: download_youtube's result for each URL, in input order
+    """
+    worker = partial(_yt_download_one, **kwargs)
+    if len(urls) == 1:
+        return [worker(urls[0])]
+    # spawn, not fork: forking after requests/tqdm threads exist is unsafe
+    with ProcessPoolExecutor(
+        max_workers=max(1, jobs), mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        return list(pool.map(worker, urls))
+
+
 def _youtube_progress_hook(d):
     """Helper function to display YouTube download progress"""
-    if d['status'] == 'downloading':
-        percentage = d.get('_percent_str', 'N/A')
-        speed = d.get('_speed_str', 'N/A')
-        eta = d.get('_eta_str', 'N/A')
+    status = d['status']
+    if status == 'downloading':
+        get = d.get
+        percentage = get('_percent_str', 'N/A')
+        speed = get('_speed_str', 'N/A')
+        eta = get('_eta_str', 'N/A')
         print(f"\rDownloading... {percentage} at {speed} (ETA: {eta})", end='')
-    elif d['status'] == 'finished':
+    elif status == 'finished':
         print("\nDownload complete! Converting format...")
 
-def validate_url(url: str) -> bool:
+def validate_url_syntax(url: str) -> bool:
     """
-    Validate if a given URL is properly formatted and accessible.
+    Check that a URL is a well-formed http(s) URL, without any network access.
     """
+    if not _URL_RE.match(url):
+        return False
     try:
         result = urlparse(url)
-        is_valid = all([result.scheme, result.netloc])
-        if not is_valid:
-            return False
-        if result.scheme not in ['http', 'https']:
-            return False
-        try:
-            response = requests.head(url, allow_redirects=True, timeout=5)
-            # Treat common success codes and "forbidden" (403) as valid to handle
-            # environments where HEAD requests are blocked but the URL exists.
-            return response.status_code in [200, 206, 403]
-        except requests.RequestException:
-            # Assume URL is valid if format is correct but network is unavailable
-            return True
     except ValueError:
         return False
+    return bool(result.netloc) and result.scheme in ('http', 'https')
+
+@lru_cache(maxsize=256)
+def _head_status(url: str) -> int:
+    """HEAD status of a URL, remembered for the rest of the run; errors are not cached"""
+    return _SESSION.head(url, allow_redirects=True, timeout=5).status_code
+
+def probe_url(url: str) -> bool:
+    """
+    Check with a HEAD request that a URL is reachable.
+    """
+    try:
+        # Treat common success codes and "forbidden" (403) as valid to handle
+        # environments where HEAD requests are blocked but the URL exists.
+        return _head_status(url) in [200, 206, 403]
+    except requests.RequestException:
+        # Assume URL is valid if format is correct but network is unavailable
+        return True
+
+def validate_url(url: str) -> bool:
+    """
+    Validate if a given URL is properly formatted and accessible.
+    """
+    return validate_url_syntax(url) and probe_url(url)
 
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,17 +2,34 @@
 Test suite for File Downloader project.
 """
 
+import io
+import json
 import os
 import sys
+import threading
 import pytest
 from unittest.mock import patch, MagicMock, PropertyMock
 import requests
+import project
 from project import (
     validate_url, 
+    validate_url_syntax,
     download_file, 
     download_youtube, 
     _validate_file_size,
     _youtube_progress_hook,
+    _plan_segments,
+    _download_segmented,
+    _preallocate,
+    _filename_from_response,
+    _get_remote_file_info,
+    SEGMENT_SIZE,
+    MAX_SEGMENTS,
+    _SESSION,
+    _BackgroundWriter,
+    _CoalescedProgress,
+    _ProgressTicker,
+    download_files,
     main
 )
 
@@ -22,7 +39,7 @@ def mock_response():
     response = MagicMock()
     response.status_code = 200
     response.headers = {
-        'content-length': '1000',
+        'content-length': '9',  # len(b'test data')
         'content-type': 'text/plain'
     }
     # Add status_code property
@@ -32,16 +49,18 @@ def mock_response():
 @pytest.fixture
 def mock_head_request(mock_response):
     """Fixture for mocking head requests"""
-    with patch('project.requests.head') as mock_head:
+    project._head_status.cache_clear()
+    with patch('project._SESSION.head') as mock_head:
         mock_head.return_value = mock_response
         yield mock_head
 
 @pytest.fixture
 def mock_get_request(mock_response):
     """Fixture for mocking get requests"""
-    with patch('project.requests.get') as mock_get:
+    with patch('project._SESSION.get') as mock_get:
         mock_get.return_value = mock_response
         mock_get.return_value.iter_content.return_value = [b'test data']
+        mock_get.return_value.raw = io.BytesIO(b'test data')
         yield mock_get
 
 def test_validate_url(mock_head_request):
@@ -54,15 +73,30 @@ def test_validate_url(mock_head_request):
     mock_head_request.side_effect = requests.RequestException()
     assert validate_url("not_a_url") == False
 
+def test_validate_url_offline_rejects(mock_head_request):
+    """Test malformed URLs are rejected without a HEAD request"""
+    assert validate_url("not_a_url") == False
+    assert validate_url("ftp://example.com") == False
+    assert validate_url("https:// spaced.com") == False
+    mock_head_request.assert_not_called()
+
+def test_probe_url_cached(mock_head_request):
+    """Test repeated probes of one URL reuse the first HEAD"""
+    assert validate_url("https://www.example.com/a") == True
+    assert validate_url("https://www.example.com/a") == True
+    assert mock_head_request.call_count == 1
+
 def test_download_file(mock_response):
     """Test file download functionality"""
-    with patch('project.requests.head') as mock_head, \
-         patch('project.requests.get') as mock_get:
+    with patch('project._SESSION.head') as mock_head, \
+         patch('project._SESSION.get') as mock_get:
         
         # Setup mocks
         mock_head.return_value = mock_response
         mock_get.return_value.status_code = 200
         mock_get.return_value.iter_content.return_value = [b'test data']
+        mock_get.return_value.headers = mock_response.headers
+        mock_get.return_value.raw = io.BytesIO(b'test data')
         
         result = download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "test.txt")
         assert result == True
@@ -71,13 +105,15 @@ def test_download_file(mock_response):
 
 def test_download_file_resume(mock_response):
     """Test file download resume functionality"""
-    with patch('project.requests.head') as mock_head, \
-         patch('project.requests.get') as mock_get:
+    with patch('project._SESSION.head') as mock_head, \
+         patch('project._SESSION.get') as mock_get:
         
         # Setup mocks
         mock_head.return_value = mock_response
         mock_get.return_value.status_code = 206
         mock_get.return_value.iter_content.return_value = [b'test data']
+        mock_get.return_value.headers = mock_response.headers
+        mock_get.return_value.raw = io.BytesIO(b'test data')
         
         # Create partial file
         filename = "resume_test.txt"
@@ -95,11 +131,11 @@ def test_download_youtube():
         instance = mock_ydl.return_value.__enter__.return_value
         
         # Test with invalid URL
-        with patch('project.validate_url', return_value=False):
+        with patch('project.validate_url_syntax', return_value=False):
             result = download_youtube("invalid_url")
             assert result == False
         
-        with patch('project.validate_url', return_value=True):
+        with patch('project.validate_url_syntax', return_value=True):
             result = download_youtube("https://youtube.com/watch?v=test")
             assert result == True
             instance.download.assert_called_once()
@@ -114,8 +150,8 @@ def test_download_file_resume_supported(mock_head_request, mock_get_request):
 
 def test_download_file_resume_unsupported(mock_response):
     """Test fallback when server doesn't support resume"""
-    with patch('project.requests.head') as mock_head, \
-         patch('project.requests.get') as mock_get:
+    with patch('project._SESSION.head') as mock_head, \
+         patch('project._SESSION.get') as mock_get:
         
         # Setup head request
         mock_head.return_value = mock_response
@@ -123,7 +159,8 @@ def test_download_file_resume_unsupported(mock_response):
         
         # Setup get request
         mock_get.return_value.status_code = 200
-        mock_get.return_value.iter_content.return_value = [b'data']
+        mock_get.return_value.iter_content.return_value = [b'test data']
+        mock_get.return_value.raw = io.BytesIO(b'test data')
         mock_get.return_value.headers = mock_response.headers
         
         result = download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "full.txt")
@@ -140,6 +177,23 @@ def test_main_file_download():
         assert main() == 0
         mock_download.assert_called_once()
 
+def test_main_multiple_files():
+    """Test main downloads every URL given on the command line"""
+    test_args = ['project.py', 'https://example.com/a.txt', 'https://example.com/b.txt']
+    with patch.object(sys, 'argv', test_args), \
+         patch('project.download_file', return_value=True) as mock_download:
+        assert main() == 0
+        assert sorted(c.args[0] for c in mock_download.call_args_list) == [
+            'https://example.com/a.txt', 'https://example.com/b.txt'
+        ]
+
+def test_main_multiple_files_partial_failure():
+    """Test main fails if any of several downloads fails"""
+    test_args = ['project.py', 'https://example.com/a.txt', 'https://example.com/b.txt']
+    with patch.object(sys, 'argv', test_args), \
+         patch('project.download_file', side_effect=[True, False]):
+        assert main() == 1
+
 def test_main_youtube_download():
     """Test main function with YouTube download"""
     test_args = ['project.py', '--youtube', 'https://youtube.com/watch?v=test']
@@ -180,11 +234,12 @@ def test_url_validation():
 
 def test_file_download():
     """Test file download functionality"""
-    with patch('requests.get') as mock_get:
+    with patch('project._SESSION.get') as mock_get:
         # Mock successful download
         mock_get.return_value.status_code = 200
-        mock_get.return_value.headers = {'content-length': '100', 'content-type': 'text/plain'}
+        mock_get.return_value.headers = {'content-length': '9', 'content-type': 'text/plain'}
         mock_get.return_value.iter_content.return_value = [b'test data']
+        mock_get.return_value.raw = io.BytesIO(b'test data')
         
         assert download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "test.txt") == True
         if os.path.exists("test.txt"):
@@ -198,3 +253,561 @@ def test_youtube_download():
         instance.download.return_value = None
         
         assert download_youtube("https://youtube.com/watch?v=test") == True
+
+
+
+def test_plan_segments():
+    """Test byte ranges cover the whole file without overlap"""
+    total = 3 * SEGMENT_SIZE + 5
+    segments = _plan_segments(total)
+    assert len(segments) == 4
+    assert segments[0][0] == 0
+    assert segments[-1][1] == total - 1
+    for (_, end), (start, _) in zip(segments, segments[1:]):
+        assert start == end + 1
+    assert _plan_segments(10) == [(0, 9)]
+    assert len(_plan_segments(100 * SEGMENT_SIZE, 32)) == MAX_SEGMENTS
+
+
+def test_main_rejects_zero_connections():
+    """Test --connections, -j and --concurrent-fragments must be at least 1"""
+    for option, value in (('--connections', '0'), ('-j', '0'), ('-j', '-5'),
+                          ('--concurrent-fragments', '0')):
+        test_args = ['project.py', option, value, 'https://example.com/file.txt']
+        with patch.object(sys, 'argv', test_args), pytest.raises(SystemExit):
+            main()
+
+
+def _range_responder(payload, requested=None):
+    """
+    Build a fake _SESSION.get / httpx client.stream that answers each Range
+    header with a 206 carrying that slice of payload. Range headers are
+    appended to requested if given.
+    """
+    def respond(*args, headers=None, **kwargs):
+        if requested is not None:
+            requested.append(headers['Range'])
+        start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+        response = MagicMock()
+        response.status_code = 206
+        response.headers = {'content-range': f'bytes {start}-{end}/{len(payload)}'}
+        response.iter_content.return_value = [payload[start:end + 1]]
+        response.iter_bytes.return_value = [payload[start:end + 1]]
+        response.__enter__.return_value = response  # httpx streams are context managers
+        return response
+    return respond
+
+
+def test_download_segmented():
+    """Test parallel range requests are stitched into one file"""
+    payload = bytes(range(256)) * 40
+    filename = "segmented.bin"
+    with patch('project._SESSION.get', side_effect=_range_responder(payload)), \
+         patch('project.SEGMENT_SIZE', 1024):
+        assert _download_segmented("https://example.com/f.bin", filename, len(payload)) == True
+    with open(filename, 'rb') as f:
+        assert f.read() == payload
+    os.remove(filename)
+
+
+def test_download_segmented_fallback():
+    """Test a 200 reply to a range request signals single-stream fallback"""
+    with patch('project._SESSION.get') as mock_get:
+        mock_get.return_value.status_code = 200
+        assert _download_segmented("https://example.com/f.bin", "fallback.bin", 2048) == False
+    assert not os.path.exists("fallback.bin")
+    assert not os.path.exists("fallback.bin.part")
+
+
+def test_download_file_progress_chunk_size(mock_head_request, mock_get_request):
+    """Test progress callbacks are coalesced to progress_chunk_size"""
+    mock_get_request.return_value.raw = io.BytesIO(b'x' * 100)
+    mock_get_request.return_value.headers = {'content-length': '100', 'content-type': 'text/plain'}
+    calls = []
+    result = download_file(
+        "https://getsamplefiles.com/download/txt/sample-1.txt",
+        "progress.txt",
+        progress_callback=lambda done, total: calls.append(done),
+        io_chunk_size=10,
+        progress_chunk_size=30,
+    )
+    assert result == True
+    assert calls == [30, 60, 90, 100]
+    os.remove("progress.txt")
+
+
+def test_download_file_single_pass(mock_head_request, mock_get_request):
+    """Test the response body is read and written exactly once"""
+    result = download_file(
+        "https://getsamplefiles.com/download/txt/sample-1.txt",
+        "single.txt",
+        progress_callback=lambda done, total: None,
+    )
+    assert result == True
+    assert mock_get_request.call_count == 1
+    with open("single.txt", 'rb') as f:
+        assert f.read() == b'test data'
+    os.remove("single.txt")
+
+
+def test_download_file_no_head_request(mock_head_request, mock_get_request):
+    """Test download_file gets size and type from the GET alone"""
+    assert download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "nohead.txt") == True
+    mock_head_request.assert_not_called()
+    assert mock_get_request.call_count == 1
+    os.remove("nohead.txt")
+
+
+def test_download_file_short_body(mock_get_request):
+    """Test a body shorter than Content-Length is reported as a failure"""
+    mock_get_request.return_value.raw = io.BytesIO(b'test')
+    assert download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "short.txt") == False
+    os.remove("short.txt")
+
+
+def test_download_file_http_error():
+    """Test a non-2xx GET reply fails the download"""
+    with patch('project._SESSION.get') as mock_get:
+        mock_get.return_value.status_code = 404
+        assert download_file("https://example.com/missing.txt", "missing.txt") == False
+    assert not os.path.exists("missing.txt")
+
+
+def test_download_file_already_complete():
+    """Test a 416 reply to the resume range means the file is complete"""
+    filename = "complete.txt"
+    with open(filename, 'wb') as f:
+        f.write(b'done')
+    with patch('project._SESSION.get') as mock_get:
+        mock_get.return_value.status_code = 416
+        assert download_file("https://example.com/complete.txt", filename) == True
+    with open(filename, 'rb') as f:
+        assert f.read() == b'done'
+    os.remove(filename)
+
+
+def test_preallocate():
+    """Test preallocation sizes the file with or without posix_fallocate"""
+    for keep_fallocate in (True, False):
+        with open("prealloc.bin", 'wb') as f:
+            if keep_fallocate or not hasattr(os, 'posix_fallocate'):
+                _preallocate(f, 4096)
+            else:
+                with patch('project.os.posix_fallocate', side_effect=OSError):
+                    _preallocate(f, 4096)
+        assert os.path.getsize("prealloc.bin") == 4096
+        os.remove("prealloc.bin")
+
+
+def test_validate_url_syntax(mock_head_request):
+    """Test the syntax check accepts http(s) URLs without touching the network"""
+    assert validate_url_syntax("https://example.com/file.txt") == True
+    assert validate_url_syntax("http://example.com") == True
+    assert validate_url_syntax("ftp://example.com") == False
+    assert validate_url_syntax("not_a_url") == False
+    assert validate_url_syntax("") == False
+    mock_head_request.assert_not_called()
+
+
+def test_filename_from_response():
+    """Test filename detection prefers Content-Disposition, then URL, then type"""
+    response = MagicMock()
+    response.headers = {'content-disposition': 'attachment; filename="../report.pdf"'}
+    assert _filename_from_response(response, "https://example.com/get?id=1") == "report.pdf"
+
+    response.headers = {'content-type': 'application/pdf'}
+    assert _filename_from_response(response, "https://example.com/files/a.zip?x=1") == "a.zip"
+    assert _filename_from_response(response, "https://example.com/LICENSE") == "LICENSE"
+    assert _filename_from_response(
+        response, "https://example.com/get", require_extension=True
+    ) == "downloaded_file.pdf"
+
+    # Names that reduce to nothing or a directory fall through to the URL/type
+    for bad in ('sub/', '..', '.'):
+        response.headers = {'content-disposition': f'attachment; filename="{bad}"',
+                            'content-type': 'application/pdf'}
+        assert _filename_from_response(response, "https://example.com/files/a.zip") == "a.zip"
+    assert _filename_from_response(response, "https://example.com/files/..") == "downloaded_file.pdf"
+
+
+def test_download_segmented_resume():
+    """Test an interrupted segmented download only fetches missing ranges"""
+    payload = bytes(range(256)) * 8
+    filename = "resumed.bin"
+    with open(filename + '.part', 'wb') as f:
+        f.write(payload[:1024] + bytes(1024))
+    with open(filename + '.part.json', 'w') as f:
+        json.dump({
+            'url': "https://example.com/f.bin",
+            'total': len(payload),
+            'segments': [[0, 1023, 1024], [1024, 2047, 0]],
+        }, f)
+    requested = []
+    with patch('project._SESSION.get', side_effect=_range_responder(payload, requested)):
+        assert _download_segmented("https://example.com/f.bin", filename, len(payload)) == True
+    assert requested == ['bytes=1024-2047']
+    with open(filename, 'rb') as f:
+        assert f.read() == payload
+    assert not os.path.exists(filename + '.part.json')
+    os.remove(filename)
+
+
+def test_session_adapter():
+    """Test the shared session pools connections and retries gateway errors"""
+    adapter = _SESSION.get_adapter("https://example.com")
+    assert adapter.max_retries.total == 3
+    assert 503 in adapter.max_retries.status_forcelist
+    assert adapter._pool_maxsize >= 8
+    # Receive buffers are left to kernel autotuning unless configured
+    assert 'socket_options' not in adapter.poolmanager.connection_pool_kw
+
+
+def test_background_writer():
+    """Test the background writer keeps order and surfaces write errors"""
+    sink = io.BytesIO()
+    writer = _BackgroundWriter(sink, depth=2)
+    for i in range(20):
+        writer.write(bytes([i]) * 10)
+    writer.close()
+    assert sink.getvalue() == b''.join(bytes([i]) * 10 for i in range(20))
+
+    broken = MagicMock()
+    broken.write.side_effect = OSError("disk full")
+    writer = _BackgroundWriter(broken)
+    writer.write(b'data')
+    with pytest.raises(OSError):
+        writer.close()
+
+
+def test_download_youtube_fragment_options():
+    """Test fragment and external downloader options reach yt-dlp"""
+    with patch('yt_dlp.YoutubeDL') as mock_ydl, \
+         patch('project.shutil.which', return_value='/usr/bin/aria2c'):
+        assert download_youtube(
+            "https://youtube.com/watch?v=test",
+            concurrent_fragments=8,
+            external_downloader='aria2c',
+        ) == True
+        opts = mock_ydl.call_args.args[0]
+        assert opts['concurrent_fragment_downloads'] == 8
+        assert opts['external_downloader'] == 'aria2c'
+        assert '-x' in opts['external_downloader_args']
+
+    with patch('yt_dlp.YoutubeDL') as mock_ydl, \
+         patch('project.shutil.which', return_value=None):
+        assert download_youtube("https://youtube.com/watch?v=test", external_downloader='aria2c') == True
+        opts = mock_ydl.call_args.args[0]
+        assert 'external_downloader' not in opts
+
+
+def test_main_youtube_batch():
+    """Test several YouTube URLs are spread over a process pool"""
+    urls = ['https://youtube.com/watch?v=a', 'https://youtube.com/watch?v=b']
+    test_args = ['project.py', '--youtube', '-j', '2', *urls]
+    with patch.object(sys, 'argv', test_args), \
+         patch('project.ProcessPoolExecutor') as mock_pool:
+        pool = mock_pool.return_value.__enter__.return_value
+        pool.map.return_value = [True, False]
+        assert main() == 1
+        assert mock_pool.call_args.kwargs['max_workers'] == 2
+        worker, mapped = pool.map.call_args.args
+        assert worker.func is project._yt_download_one
+        assert list(mapped) == urls
+
+
+def test_coalesced_progress():
+    """Test small reads reach tqdm as one batched update"""
+    bar = MagicMock()
+    updates = _CoalescedProgress(bar, size=100, interval=60)
+    for _ in range(9):
+        updates.update(10)
+    bar.update.assert_not_called()
+    updates.update(10)
+    bar.update.assert_called_once_with(100)
+    updates.update(5)
+    updates.flush()
+    assert bar.update.call_args.args == (5,)
+
+
+def test_download_file_compressed(mock_get_request):
+    """Test a compressed body is not judged by its wire Content-Length"""
+    mock_get_request.return_value.headers = {
+        'content-length': '100', 'content-encoding': 'gzip', 'content-type': 'text/plain',
+    }
+    assert download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "gzip.txt") == True
+    os.remove("gzip.txt")
+
+
+def test_download_file_resume_uncompressed(mock_get_request):
+    """Test resumed ranges ask for the identity encoding"""
+    mock_get_request.return_value.status_code = 206
+    with open("identity.txt", 'wb') as f:
+        f.write(b'partial')
+    assert download_file("https://getsamplefiles.com/download/txt/sample-1.txt", "identity.txt") == True
+    headers = mock_get_request.call_args.kwargs['headers']
+    assert headers == {'Range': 'bytes=7-', 'Accept-Encoding': 'identity'}
+    os.remove("identity.txt")
+
+
+def test_download_file_conditional_get(mock_get_request):
+    """Test a finished download is revalidated and skipped on 304"""
+    url = "https://getsamplefiles.com/download/txt/sample-1.txt"
+    mock_get_request.return_value.headers = {
+        'content-length': '9', 'content-type': 'text/plain', 'etag': '"v1"',
+    }
+    assert download_file(url, "cached.txt") == True
+    with open("cached.txt.meta.json", encoding='utf-8') as f:
+        assert json.load(f)['etag'] == '"v1"'
+
+    type(mock_get_request.return_value).status_code = PropertyMock(return_value=304)
+    assert download_file(url, "cached.txt") == True
+    assert mock_get_request.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+    with open("cached.txt", 'rb') as f:
+        assert f.read() == b'test data'
+
+    type(mock_get_request.return_value).status_code = PropertyMock(return_value=200)
+    mock_get_request.return_value.raw = io.BytesIO(b'test data')
+    assert download_file(url, "cached.txt", use_cache=False) == True
+    assert mock_get_request.call_args.kwargs['headers'] == {}
+    os.remove("cached.txt")
+    os.remove("cached.txt.meta.json")
+
+
+def test_progress_ticker():
+    """Test the ticker sums every registered download into one line"""
+    stream = io.StringIO()
+    with _ProgressTicker(stream=stream, interval=60) as ticker:
+        first, second = ticker.callback(), ticker.callback()
+        first(1024, 1024)
+        second(512, 2048)
+    assert stream.getvalue() == "\r1/2 files  1.50kB/3.00kB\n"
+
+
+def test_progress_ticker_log():
+    """Test messages are printed on their own line, then the status line redrawn"""
+    stream = io.StringIO()
+    ticker = _ProgressTicker(stream=stream, interval=60)
+    ticker.callback()(5, 10)
+    ticker.log("Resuming download from 5 bytes")
+    assert stream.getvalue() == "\r\x1b[KResuming download from 5 bytes\n\r0/1 files  5.00B/10.0B"
+
+
+def test_download_files_quiet():
+    """Test quiet mode hands each download a ticker callback instead of tqdm"""
+    with patch('project.download_file', return_value=True) as mock_download, \
+         patch('project._ProgressTicker._render'):
+        assert download_files(['https://example.com/a.txt'], quiet=True) == [True]
+    assert callable(mock_download.call_args.kwargs['progress_callback'])
+
+
+def test_get_remote_file_info_range_probe():
+    """Test size and range support come from one bytes=0-0 GET"""
+    response = MagicMock()
+    response.status_code = 206
+    response.headers = {'content-range': 'bytes 0-0/5000', 'content-length': '1',
+                        'content-type': 'application/zip'}
+    with patch('project._SESSION.get', return_value=response) as mock_get, \
+         patch('project._SESSION.head') as mock_head:
+        assert _get_remote_file_info("https://example.com/a.zip") == (5000, 'application/zip', True)
+    assert mock_get.call_args.kwargs['headers']['Range'] == 'bytes=0-0'
+    mock_head.assert_not_called()
+
+    response.status_code = 200
+    response.headers = {'content-length': '5000', 'content-type': 'application/zip'}
+    with patch('project._SESSION.get', return_value=response):
+        assert _get_remote_file_info("https://example.com/a.zip") == (5000, 'application/zip', False)
+
+    response.headers = {'content-length': 'abc', 'content-type': 'application/zip'}
+    with patch('project._SESSION.get', return_value=response):
+        assert _get_remote_file_info("https://example.com/a.zip") == (0, 'application/zip', False)
+
+
+def test_download_file_rejects_webpages(mock_get_request):
+    """Test HTML and XHTML responses are refused by media type"""
+    url = "https://getsamplefiles.com/download/txt/sample-1.txt"
+    for content_type in ('text/html; charset=utf-8', 'application/xhtml+xml'):
+        mock_get_request.return_value.headers = {'content-length': '9', 'content-type': content_type}
+        assert download_file(url, "page.html") == False
+    assert not os.path.exists("page.html")
+
+
+def test_download_segmented_http2():
+    """Test --http2 segments go through one shared httpx client"""
+    payload = bytes(range(256)) * 8
+    client = MagicMock()
+    client.stream.side_effect = _range_responder(payload)
+    with patch('project.httpx') as mock_httpx, \
+         patch('project._SESSION.get') as mock_get, \
+         patch('project.SEGMENT_SIZE', 1024):
+        mock_httpx.Client.return_value = client
+        assert _download_segmented("https://example.com/f.bin", "h2.bin", len(payload), http2=True) == True
+    assert mock_httpx.HTTPTransport.call_args.kwargs['http2'] == True
+    assert mock_httpx.HTTPTransport.call_args.kwargs['retries'] == 3
+    assert client.stream.call_count == 2
+    mock_get.assert_not_called()
+    client.close.assert_called_once()
+    with open("h2.bin", 'rb') as f:
+        assert f.read() == payload
+    os.remove("h2.bin")
+
+
+def test_http2_client_missing_httpx():
+    """Test --http2 falls back to the requests session without httpx"""
+    with patch('project.httpx', None):
+        assert project._http2_client() is None
+
+
+def test_download_files_up_to_date_batch(capsys):
+    """Test 304 answers count as finished on the batch status line"""
+    urls = ['https://example.com/a.txt', 'https://example.com/b.txt']
+    for url in urls:
+        name = url.rsplit('/', 1)[1]
+        with open(name, 'wb') as f:
+            f.write(b'test data')
+        with open(name + '.meta.json', 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'etag': '"v1"', 'last_modified': None, 'size': 9}, f)
+    response = MagicMock()
+    response.status_code = 304
+    response.headers = {}
+    with patch('project._SESSION.get', return_value=response):
+        assert download_files(urls) == [True, True]
+    out = capsys.readouterr().out
+    assert out.rstrip().endswith("2/2 files  18.0B/18.0B")
+    # Notices go through the ticker so they never land inside the status line
+    assert "\r\x1b[KFile a.txt is up to date\n" in out
+    for url in urls:
+        name = url.rsplit('/', 1)[1]
+        os.remove(name)
+        os.remove(name + '.meta.json')
+
+
+def test_download_files_ctrl_c_stops_batch():
+    """Test Ctrl-C cancels queued downloads and signals running ones"""
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def fake_download(url, stop_event=None, **kwargs):
+        if url.endswith('a.txt'):
+            started.wait(5)
+            raise KeyboardInterrupt()
+        started.set()
+        if stop_event.wait(5):
+            stopped.set()
+        return False
+
+    urls = ['https://example.com/a.txt', 'https://example.com/b.txt']
+    with patch('project.download_file', side_effect=fake_download), \
+         patch('project._ProgressTicker._render'), \
+         pytest.raises(KeyboardInterrupt):
+        # Returns as soon as a.txt is interrupted, without waiting on b.txt
+        download_files(urls, jobs=2)
+    assert stopped.wait(5)
+
+
+def test_download_file_stop_event(mock_get_request):
+    """Test a set stop_event abandons the copy and keeps the partial file"""
+    stop_event = threading.Event()
+    stop_event.set()
+    assert download_file(
+        "https://getsamplefiles.com/download/txt/sample-1.txt", "stopped.txt", stop_event=stop_event
+    ) == False
+    assert os.path.exists("stopped.txt")
+    os.remove("stopped.txt")
+
+
+def test_download_segmented_stop_event():
+    """Test a cancelled segmented download saves its state for resume"""
+    payload = bytes(range(256)) * 8
+    stop_event = threading.Event()
+    stop_event.set()
+    with patch('project._SESSION.get', side_effect=_range_responder(payload)), \
+         patch('project.SEGMENT_SIZE', 1024), \
+         pytest.raises(project._Stopped):
+        _download_segmented("https://example.com/f.bin", "cancel.bin", len(payload), stop_event=stop_event)
+    with open("cancel.bin.part.json", encoding='utf-8') as f:
+        assert json.load(f)['segments'] == [[0, 1023, 0], [1024, 2047, 0]]
+    os.remove("cancel.bin.part")
+    os.remove("cancel.bin.part.json")
+
+
+def test_download_file_output_name_in_use(mock_get_request):
+    """Test a name already being written by another download is refused"""
+    assert project._claim_file('x.txt')
+    try:
+        with patch('project._ProgressTicker._render'):
+            assert download_files(['https://a.example.com/x.txt', 'https://b.example.com/x.txt']) == [False, False]
+    finally:
+        project._release_file('x.txt')
+    assert not os.path.exists('x.txt')
+
+    # Finished downloads give the name back
+    assert download_file('https://a.example.com/x.txt') == True
+    assert project._claim_file('x.txt')
+    project._release_file('x.txt')
+    os.remove('x.txt')
+
+
+def test_download_segmented_http2_retries_gateway_errors():
+    """Test HTTP/2 segment requests back off and retry a 503 like the session does"""
+    payload = bytes(range(256)) * 4
+    respond = _range_responder(payload)
+    unavailable = MagicMock()
+    unavailable.status_code = 503
+    unavailable.__enter__.return_value = unavailable
+    client = MagicMock()
+    client.stream.side_effect = [unavailable, respond(headers={'Range': 'bytes=0-1023'})]
+    with patch('project.httpx') as mock_httpx, patch('project.time.sleep') as mock_sleep:
+        mock_httpx.Client.return_value = client
+        assert _download_segmented("https://example.com/f.bin", "retry.bin", len(payload), http2=True) == True
+    mock_sleep.assert_called_once_with(0.3)
+    with open("retry.bin", 'rb') as f:
+        assert f.read() == payload
+    os.remove("retry.bin")
+
+
+def test_download_file_http2_network_error(mock_get_request, capsys):
+    """Test a failed HTTP/2 stream is reported as a network error"""
+    class FakeHTTPError(Exception):
+        pass
+
+    mock_get_request.return_value.headers = {
+        'content-length': str(2 * SEGMENT_SIZE), 'accept-ranges': 'bytes', 'content-type': 'application/zip',
+    }
+    client = MagicMock()
+    client.stream.side_effect = FakeHTTPError("stream reset")
+    with patch('project.httpx') as mock_httpx, \
+         patch('project._NETWORK_ERRORS', (requests.RequestException, FakeHTTPError)):
+        mock_httpx.Client.return_value = client
+        assert download_file("https://example.com/big.zip", "big.zip", http2=True) == False
+    assert "Network error during download: stream reset" in capsys.readouterr().out
+    os.remove("big.zip.part")
+    os.remove("big.zip.part.json")
+
+
+def test_download_segmented_checkpoints_state():
+    """Test .part.json tracks progress during the download, not only on errors"""
+    payload = bytes(range(256)) * 4
+    seen = []
+
+    def body(data):
+        for offset in range(0, len(data), 256):
+            if offset:
+                with open("checkpoint.bin.part.json", encoding='utf-8') as f:
+                    seen.append(json.load(f)['segments'][0][2])
+            yield data[offset:offset + 256]
+
+    def fake_get(url, headers=None, **kwargs):
+        start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+        response = MagicMock()
+        response.status_code = 206
+        response.headers = {}
+        response.iter_content.return_value = body(payload[start:end + 1])
+        return response
+
+    with patch('project._SESSION.get', side_effect=fake_get), \
+         patch('project.STATE_SAVE_SIZE', 256):
+        assert _download_segmented("https://example.com/f.bin", "checkpoint.bin", len(payload)) == True
+    # Each check sees every chunk before it, because it was fsynced and saved
+    assert seen == [256, 512, 768]
+    assert not os.path.exists("checkpoint.bin.part.json")
+    os.remove("checkpoint.bin")